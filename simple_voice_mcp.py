@@ -1,28 +1,59 @@
 #!/usr/bin/env python
 """Simple voice synthesis MCP server - just send text and it plays."""
 
+import argparse
+import asyncio
+import functools
+import logging
 import os
 import sys
+from contextlib import asynccontextmanager
+from typing import Optional
 from mcp.server.fastmcp import FastMCP
 from pydantic import Field
 
 # Import our modules
 from src.dictionary_manager import DictionaryManager
 from src.text_converter import TextConverter
-from src.audio_player_vlc import synthesize_and_play  # Use VLC for multiple simultaneous playback
+from src.audio_player_vlc import synthesize_and_play, close_client, prepare_playback  # Use VLC for multiple simultaneous playback
+
+def parse_model_arg() -> Optional[str]:
+    """Parse the --model command line argument.
+    
+    The argument is removed from sys.argv so MCP doesn't see it. A
+    --model without a value is ignored and the default model is used.
+    
+    Returns:
+        The model name if specified, otherwise None
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False, exit_on_error=False)
+    parser.add_argument("--model")
+    try:
+        args, remaining = parser.parse_known_args(sys.argv[1:])
+    except argparse.ArgumentError:
+        return None
+    sys.argv = [sys.argv[0], *remaining]
+    return args.model
+
+# Debug logging is enabled with VOICE_MCP_DEBUG=1
+logger = logging.getLogger("simple_voice_mcp")
+logger.setLevel(logging.DEBUG if os.getenv("VOICE_MCP_DEBUG") else logging.INFO)
 
 # Parse command line arguments for model
-model_arg = None
-for i, arg in enumerate(sys.argv):
-    if arg == "--model" and i + 1 < len(sys.argv):
-        model_arg = sys.argv[i + 1]
-        # Remove the arguments so MCP doesn't see them
-        sys.argv.pop(i)  # Remove --model
-        sys.argv.pop(i)  # Remove the model value
-        break
+model_arg = parse_model_arg()
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Prepare playback on startup and close the shared HTTP client on shutdown."""
+    prepare_task = asyncio.create_task(prepare_playback())
+    try:
+        yield
+    finally:
+        prepare_task.cancel()
+        await close_client()
 
 # Initialize FastMCP server
-mcp = FastMCP("simple-voice", version="1.0.0")
+mcp = FastMCP("simple-voice", version="1.0.0", lifespan=lifespan)
 
 # Voice API configuration
 VOICE_API_BASE = os.getenv("VOICE_API_BASE", "https://kurausuai-voice.ngrok.app")
@@ -54,10 +85,18 @@ MODEL_INFO = {
     "oneesan_1": "少し声の高めのお姉さんの声",
 }
 
-# Initialize managers
-dict_path = os.path.join(os.path.dirname(__file__), 'custom_words.csv')
-dict_manager = DictionaryManager(dict_path)
-text_converter = TextConverter(dict_manager)
+# Managers are created on first use so server startup doesn't load the dictionary
+@functools.cache
+def get_dict_manager() -> DictionaryManager:
+    """Get the shared dictionary manager."""
+    dict_path = os.path.join(os.path.dirname(__file__), 'custom_words.csv')
+    return DictionaryManager(dict_path)
+
+
+@functools.cache
+def get_text_converter() -> TextConverter:
+    """Get the shared text converter."""
+    return TextConverter(get_dict_manager())
 
 # Create dynamic tool with model-specific description
 model_desc = MODEL_INFO.get(DEFAULT_MODEL, f"{DEFAULT_MODEL}の声")
@@ -74,15 +113,15 @@ say_tool = mcp.tool(
 async def say(text: str) -> str:
     """Say the given text using voice synthesis."""
     try:
-        print(f"[DEBUG] Say called with: {text}")
+        logger.debug("Say called with: %s", text)
         
         # Convert text to katakana
-        converted_text, unconverted_words = text_converter.convert_to_katakana(text)
-        print(f"[DEBUG] Converted text: {converted_text}")
+        converted_text, unconverted_words = get_text_converter().convert_to_katakana(text)
+        logger.debug("Converted text: %s", converted_text)
         
         # Synthesize and play
         error = await synthesize_and_play(converted_text, VOICE_API_BASE, DEFAULT_MODEL)
-        print(f"[DEBUG] Synthesis result: {error}")
+        logger.debug("Synthesis result: %s", error)
         
         if error:
             return f"Error: {error}"
@@ -92,14 +131,12 @@ async def say(text: str) -> str:
             else:
                 return "✓"
     except Exception as e:
-        print(f"[ERROR] Exception in say: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Exception in say: %s", e)
         return f"Exception: {str(e)}"
 
 
 @mcp.tool(description="カスタム辞書に新しい英単語とカタカナ読みのペアを登録します。HDMIやAPIなどの略語や、.pyのような拡張子も登録できます。複数登録する場合はカンマ区切りで指定できます。")
-def add_to_dictionary(
+async def add_to_dictionary(
     english: str = Field(description="英単語、略語、または拡張子。複数の場合はカンマ区切り（例: hdmi,api,csv,.py,.csv または 1つ,2つ,3つ）"),
     katakana: str = Field(description="カタカナ読み。複数の場合はカンマ区切り（例: エイチディーエムアイ,エーピーアイ,シーエスブイ,ドットパイ,ドットシーエスブイ または ひとつ,ふたつ,みっつ）")
 ) -> str:
@@ -134,14 +171,18 @@ def add_to_dictionary(
     
     # 単一の場合
     if len(english_list) == 1:
-        success, message = dict_manager.add_entry(english_list[0], katakana_list[0])
+        [(success, message)] = await get_dict_manager().add_entries_async(
+            [(english_list[0], katakana_list[0])]
+        )
         return message
     
     # 複数の場合
     results = []
     success_count = 0
-    for eng, kana in zip(english_list, katakana_list):
-        success, message = dict_manager.add_entry(eng, kana)
+    entries = list(zip(english_list, katakana_list))
+    # 辞書ファイルへの書き込みは1回にまとめる
+    entry_results = await get_dict_manager().add_entries_async(entries)
+    for (eng, kana), (success, message) in zip(entries, entry_results):
         if success:
             success_count += 1
             results.append(f"✓ {eng} → {kana}")
@@ -153,7 +194,7 @@ def add_to_dictionary(
 
 
 @mcp.tool(description="カスタム辞書から指定した英単語のエントリを削除します。複数削除する場合はカンマ区切りで指定できます。")
-def remove_from_dictionary(
+async def remove_from_dictionary(
     english: str = Field(description="削除する英単語。複数の場合はカンマ区切り（例: hdmi,api,.py または test,1つ,2つ）")
 ) -> str:
     """
@@ -176,14 +217,15 @@ def remove_from_dictionary(
     
     # 単一の場合
     if len(english_list) == 1:
-        success, message = dict_manager.remove_entry(english_list[0])
+        [(success, message)] = await get_dict_manager().remove_entries_async([english_list[0]])
         return message
     
     # 複数の場合
     results = []
     success_count = 0
-    for eng in english_list:
-        success, message = dict_manager.remove_entry(eng)
+    # 辞書ファイルへの書き込みは1回にまとめる
+    entry_results = await get_dict_manager().remove_entries_async(english_list)
+    for eng, (success, message) in zip(english_list, entry_results):
         if success:
             success_count += 1
             results.append(f"✓ {eng} を削除")
@@ -202,7 +244,7 @@ def list_dictionary() -> str:
     Returns:
         辞書エントリの一覧、または空の場合はその旨のメッセージ
     """
-    return dict_manager.list_entries()
+    return get_dict_manager().list_entries()
 
 
 if __name__ == "__main__":
@@ -1,52 +1,157 @@
-"""Simple audio playback module for WSL - uses VLC for multiple simultaneous playback"""
+"""Simple audio playback module for WSL - uses VLC for multiple simultaneous playback
+
+Outside WSL, audio is played locally with sounddevice if it is installed.
+"""
 
 import os
-import tempfile
+import functools
+import ntpath
+import itertools
+import hashlib
+import shutil
 import subprocess
 import platform
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, Tuple
 import httpx
-import urllib.parse
 import asyncio
 import time
 import glob
 import threading
+from concurrent.futures import Future
+from contextlib import ExitStack
 from queue import Queue
 
+# The packages raise OSError on import when PortAudio or libsndfile is missing
+try:
+    import sounddevice
+    import soundfile
+except (ImportError, OSError):
+    sounddevice = None
+    soundfile = None
+
+@functools.cache
 def is_wsl() -> bool:
-    """Check if running in WSL environment."""
+    """Check if running in WSL environment (cached, it can't change at runtime)."""
     return 'microsoft-standard' in platform.uname().release.lower()
 
 
 # VLC executable path
 VLC_PATH = r"C:\Program Files\VideoLAN\VLC\vlc.exe"
 
+# Local cache of synthesized audio, keyed by model and text
+AUDIO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "simple-voice")
+AUDIO_CACHE_MAX_FILES = 64
+# Partial downloads older than this (seconds) were left by a process that died
+AUDIO_PARTIAL_MAX_AGE = 600
+
+# Unique file names come from the process ID and a counter; several server
+# processes (one per voice model) share the Windows temp directory
+_FILE_ID_PREFIX = os.getpid()
+_file_ids = itertools.count()
+
+# Shared HTTP client (connection pooling / keep-alive across requests)
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=30.0,
+            headers={"accept": "audio/wav"},
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+        )
+    return _client
+
+async def close_client() -> None:
+    """Close the shared HTTP client if it was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@functools.cache
+def get_vlc_wsl_path() -> Optional[str]:
+    """Get the WSL path of the VLC executable so it can be launched directly.
+    
+    Returns:
+        The WSL path if VLC was found, otherwise None
+    """
+    try:
+        vlc_wsl_path = subprocess.check_output(
+            ["wslpath", "-u", VLC_PATH]
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return vlc_wsl_path if os.path.exists(vlc_wsl_path) else None
+
+
 # Audio queues and worker threads per model
-audio_queues: Dict[str, Queue] = {}
+audio_queues: Dict[str, "Queue[Optional[Future[Optional[Callable[[], None]]]]]"] = {}
 worker_threads: Dict[str, threading.Thread] = {}
 
+def play_with_vlc(win_path: str, wsl_path: str) -> None:
+    """Play an audio file in the Windows temp directory with VLC, then remove it.
+    
+    Args:
+        win_path: Windows path of the audio file
+        wsl_path: WSL path of the same file
+    """
+    # Play audio file using VLC, launched directly through WSL interop
+    # when possible to avoid starting PowerShell for every file
+    vlc_wsl_path = get_vlc_wsl_path()
+    if vlc_wsl_path:
+        command = [vlc_wsl_path, "--intf", "dummy", "--dummy-quiet", "--play-and-exit", win_path]
+    else:
+        # PowerShell doesn't wait for GUI executables like vlc.exe; piping
+        # to Out-Null makes it wait so the file isn't removed too early
+        ps_command = f'''
+        & "{VLC_PATH}" --intf dummy --dummy-quiet --play-and-exit "{win_path}" | Out-Null
+        '''
+        command = ["powershell.exe", "-NoProfile", "-Command", ps_command]
+    
+    try:
+        # Wait for playback to complete
+        subprocess.run(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False
+        )
+    finally:
+        # Playback has finished, so the file can be removed right away
+        try:
+            os.remove(wsl_path)
+        except OSError:
+            pass
+
+
+def play_local_file(file_path: str) -> None:
+    """Play an audio file on the local output device with sounddevice.
+    
+    Args:
+        file_path: Path of the audio file
+    """
+    data, samplerate = soundfile.read(file_path, dtype="float32", always_2d=True)
+    # Closing the stream waits until the written audio has been played
+    with sounddevice.OutputStream(samplerate=samplerate, channels=data.shape[1]) as stream:
+        stream.write(data)
+
+
 def audio_worker(model: str):
-    """Worker thread that processes audio files sequentially for a specific model."""
+    """Worker thread that runs playback jobs sequentially for a specific model."""
     queue = audio_queues[model]
     while True:
         try:
-            win_path = queue.get()
-            if win_path is None:  # Shutdown signal
+            slot = queue.get()
+            if slot is None:  # Shutdown signal
                 break
-                
-            # Play audio file using VLC
-            ps_command = f'''
-            & "{VLC_PATH}" --intf dummy --dummy-quiet --play-and-exit "{win_path}"
-            '''
-            
-            # Wait for playback to complete
-            subprocess.run(
-                ["powershell.exe", "-NoProfile", "-Command", ps_command],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=False
-            )
-            
+            # Wait until the request that reserved this slot has its audio
+            # ready; None means the request failed and there is nothing to play
+            play = slot.result()
+            if play is not None:
+                play()
             queue.task_done()
         except Exception:
             queue.task_done()
@@ -62,41 +167,137 @@ def ensure_worker_running(model: str):
 
 
 def cleanup_old_temp_files() -> None:
-    """Clean up old temporary audio files from both WSL and Windows temp directories."""
-    # Clean WSL temp files
-    temp_dir = tempfile.gettempdir()
-    audio_files = glob.glob(os.path.join(temp_dir, "tmp*.wav"))
-    
-    if len(audio_files) > 10:
-        # Sort by modification time and remove oldest files
-        audio_files.sort(key=os.path.getmtime)
-        files_to_remove = audio_files[:-10]  # Keep only the 10 newest
-        
-        for file_path in files_to_remove:
-            try:
+    """Clean up leftover audio files from the Windows temp directory.
+    
+    Played files are removed by the audio workers, so this only catches
+    files left behind by an earlier session and runs once at startup.
+    """
+    if not is_wsl():
+        return
+    
+    ps_script = '''
+    $temp = [System.IO.Path]::GetTempPath()
+    $files = Get-ChildItem -Path $temp -Filter "voice_*.wav" | Sort-Object LastWriteTime
+    if ($files.Count -gt 10) {
+        $toRemove = $files[0..($files.Count - 11)]
+        $toRemove | ForEach-Object { Remove-Item $_.FullName -Force -ErrorAction SilentlyContinue }
+    }
+    '''
+    subprocess.run(
+        ["powershell.exe", "-NoProfile", "-Command", ps_script],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def get_cache_path(text: str, model: str) -> str:
+    """Get the audio cache file path for a text and model pair."""
+    key = hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(AUDIO_CACHE_DIR, f"{key}.wav")
+
+
+def prune_audio_cache() -> None:
+    """Remove the least recently used cached audio files beyond the limit.
+    
+    Stale partial downloads are removed as well.
+    """
+    # Other processes may still be writing their recent .part files
+    cutoff = time.time() - AUDIO_PARTIAL_MAX_AGE
+    for file_path in glob.glob(os.path.join(AUDIO_CACHE_DIR, "*.part")):
+        try:
+            if os.path.getmtime(file_path) < cutoff:
                 os.remove(file_path)
-            except OSError:
-                pass  # Ignore if file is already gone or in use
+        except OSError:
+            pass
+    
+    cached_files = glob.glob(os.path.join(AUDIO_CACHE_DIR, "*.wav"))
+    if len(cached_files) <= AUDIO_CACHE_MAX_FILES:
+        return
+    
+    def access_time(file_path: str) -> float:
+        try:
+            return os.path.getmtime(file_path)
+        except OSError:
+            return 0.0
+    
+    # Cache hits refresh the mtime, so the oldest mtime is least recently used
+    cached_files.sort(key=access_time)
+    for file_path in cached_files[:-AUDIO_CACHE_MAX_FILES]:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+
+@functools.cache
+def get_windows_temp_dir() -> Tuple[str, str]:
+    """Get the Windows temp directory and its WSL mount path.
+    
+    The directory doesn't change during a session, so the PowerShell and
+    wslpath lookups only run once.
+    
+    Returns:
+        Tuple of (windows_dir, wsl_dir)
+    """
+    # Get Windows temp directory
+    ps_command = "[System.IO.Path]::GetTempPath()"
+    result = subprocess.run(
+        ["powershell.exe", "-NoProfile", "-Command", ps_command],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    win_temp = result.stdout.strip()
+    
+    # Convert Windows temp directory to its WSL mount path
+    wsl_temp = subprocess.check_output(
+        ["wslpath", "-u", win_temp]
+    ).decode().strip()
+    return win_temp, wsl_temp
+
+
+def get_windows_temp_paths(model: str) -> Tuple[str, str]:
+    """Build a unique audio file path inside the Windows temp directory.
+    
+    Args:
+        model: Voice model the file is created for
+        
+    Returns:
+        Tuple of (windows_path, wsl_path) pointing to the same file
+    """
+    win_temp, wsl_temp = get_windows_temp_dir()
+    
+    # Create unique filename for this model
+    win_filename = f"voice_{model}_{_FILE_ID_PREFIX}_{next(_file_ids)}.wav"
+    win_path = ntpath.join(win_temp, win_filename)
+    wsl_path = os.path.join(wsl_temp, win_filename)
+    return win_path, wsl_path
+
+
+async def prepare_playback() -> None:
+    """Resolve the Windows temp directory and clean up leftover audio files.
     
-    # Clean Windows temp files
+    Runs once at startup so none of these steps delay the first request.
+    """
+    await asyncio.to_thread(prune_audio_cache)
     if is_wsl():
-        ps_script = '''
-        $temp = [System.IO.Path]::GetTempPath()
-        $files = Get-ChildItem -Path $temp -Filter "voice_*.wav" | Sort-Object LastWriteTime
-        if ($files.Count -gt 10) {
-            $toRemove = $files[0..($files.Count - 11)]
-            $toRemove | ForEach-Object { Remove-Item $_.FullName -Force -ErrorAction SilentlyContinue }
-        }
-        '''
-        subprocess.run(
-            ["powershell.exe", "-Command", ps_script],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
+        try:
+            await asyncio.to_thread(get_windows_temp_dir)
+        except Exception:
+            pass  # Retried on first use
+        try:
+            await asyncio.to_thread(cleanup_old_temp_files)
+        except Exception:
+            pass  # Leftover files are only a disk space concern
 
 
-async def synthesize_and_play(text: str, voice_api_base: str, model: str) -> Optional[str]:
-    """Synthesize and play voice from text using VLC in WSL.
+async def _fetch_audio(
+    text: str, voice_api_base: str, model: str
+) -> Tuple[Optional[Callable[[], None]], Optional[str], bool]:
+    """Fetch synthesized audio from the cache or the voice API.
+    
+    Synthesized audio is kept in a local cache so repeated text is
+    played without calling the voice API again.
     
     Args:
         text: Text to synthesize
@@ -104,76 +305,98 @@ async def synthesize_and_play(text: str, voice_api_base: str, model: str) -> Opt
         model: Voice model to use
         
     Returns:
-        Error message if failed, None if successful
+        Tuple of (playback job or None, error message or None, whether the
+        audio was newly downloaded)
     """
-    # URL encode the text
-    encoded_text = urllib.parse.quote(text)
-    url = f"{voice_api_base}/voice?text={encoded_text}&speaker_name={model}"
+    win_path: Optional[str] = None
+    wsl_path: Optional[str] = None
+    if is_wsl():
+        try:
+            win_path, wsl_path = await asyncio.to_thread(get_windows_temp_paths, model)
+        except Exception as e:
+            return None, f"VLC playback error: {str(e)}", False
     
-    async with httpx.AsyncClient() as client:
+    cache_path = get_cache_path(text, model)
+    cache_hit = os.path.exists(cache_path)
+    if cache_hit:
+        # Cache hit: skip the API and reuse the previously synthesized audio
         try:
-            response = await client.get(
-                url,
-                headers={"accept": "audio/wav"},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            audio_data = response.content
-            
-            # Clean up old temp files before creating new one
-            cleanup_old_temp_files()
-            
-            # Create a temporary file to store the audio
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                tmp_file.write(audio_data)
-                tmp_file_path = tmp_file.name
-            
-            # Check if running in WSL
-            if is_wsl():
-                try:
-                    # Get Windows temp directory
-                    ps_command = "[System.IO.Path]::GetTempPath()"
-                    result = subprocess.run(
-                        ["powershell.exe", "-Command", ps_command],
-                        capture_output=True,
-                        text=True
-                    )
-                    win_temp = result.stdout.strip()
-                    
-                    # Create unique filename for this model
-                    import uuid
-                    win_filename = f"voice_{model}_{uuid.uuid4().hex[:8]}.wav"
-                    win_path = os.path.join(win_temp, win_filename).replace('/', '\\')
-                    
-                    # Convert WSL path to Windows path
-                    wsl_path = subprocess.check_output(
-                        ["wslpath", "-w", tmp_file_path]
-                    ).decode().strip()
-                    
-                    # Copy file to Windows temp
-                    copy_command = f'Copy-Item "{wsl_path}" "{win_path}" -Force'
-                    subprocess.run(
-                        ["powershell.exe", "-Command", copy_command],
-                        check=True
-                    )
-                    
-                    # Ensure worker thread is running for this model
-                    ensure_worker_running(model)
-                    
-                    # Add audio file to model-specific queue for sequential playback
-                    audio_queues[model].put(win_path)
-                    
-                    # Clean up WSL temp file
+            os.utime(cache_path)
+            if wsl_path:
+                await asyncio.to_thread(shutil.copyfile, cache_path, wsl_path)
+        except Exception as e:
+            return None, f"Audio cache error: {str(e)}", False
+    else:
+        client = get_client()
+        partial_path = f"{cache_path}.{_FILE_ID_PREFIX}_{next(_file_ids)}.part"
+        try:
+            os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+            # Stream the audio into the cache (and the Windows temp directory)
+            async with client.stream(
+                "GET",
+                f"{voice_api_base}/voice",
+                params={"text": text, "speaker_name": model}
+            ) as response:
+                response.raise_for_status()
+                with ExitStack() as stack:
+                    audio_files = [stack.enter_context(open(partial_path, "wb"))]
+                    if wsl_path:
+                        audio_files.append(stack.enter_context(open(wsl_path, "wb")))
+                    async for chunk in response.aiter_bytes(chunk_size=65536):
+                        for audio_file in audio_files:
+                            audio_file.write(chunk)
+            os.replace(partial_path, cache_path)
+        except Exception as e:
+            for file_path in (wsl_path, partial_path):
+                if file_path:
                     try:
-                        os.remove(tmp_file_path)
-                    except:
+                        os.remove(file_path)
+                    except OSError:
                         pass
-                        
-                    return None
-                except Exception as e:
-                    return f"VLC playback error: {str(e)}"
-            else:
-                return "Audio playback not implemented for non-WSL environments"
-                
-        except Exception as e:
-            return f"Error: {str(e)}"
\ No newline at end of file
+            return None, f"Error: {str(e)}", False
+    
+    if win_path and wsl_path:
+        return functools.partial(play_with_vlc, win_path, wsl_path), None, not cache_hit
+    return functools.partial(play_local_file, cache_path), None, not cache_hit
+
+
+async def synthesize_and_play(text: str, voice_api_base: str, model: str) -> Optional[str]:
+    """Synthesize and play voice from text.
+    
+    In WSL the audio is written directly into the Windows temp directory
+    through its WSL mount and played with VLC. Elsewhere it is played from
+    the local cache with sounddevice when that is installed.
+    
+    The playback slot is reserved before the audio is requested, so
+    concurrent requests overlap their downloads with earlier playback
+    while still playing in the order they were made.
+    
+    Args:
+        text: Text to synthesize
+        voice_api_base: Base URL for voice API
+        model: Voice model to use
+        
+    Returns:
+        Error message if failed, None if successful
+    """
+    if not is_wsl() and sounddevice is None:
+        return "Audio playback not implemented for non-WSL environments"
+    
+    # Ensure worker thread is running for this model
+    ensure_worker_running(model)
+    
+    # Reserve a place in the model-specific queue for sequential playback
+    slot: "Future[Optional[Callable[[], None]]]" = Future()
+    audio_queues[model].put(slot)
+    try:
+        play, error, downloaded = await _fetch_audio(text, voice_api_base, model)
+    except BaseException:
+        slot.set_result(None)
+        raise
+    slot.set_result(play)
+    
+    # Only a new download can push the cache over its limit; pruning runs
+    # after playback has been queued so it doesn't delay the first audio
+    if downloaded:
+        await asyncio.to_thread(prune_audio_cache)
+    return error
@@ -2,7 +2,28 @@
 
 import os
 import csv
-from typing import Dict, Tuple, List
+import sys
+import tempfile
+import asyncio
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple, List
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between checks of the CSV file for external changes
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+def normalize_key(word: str) -> str:
+    """Normalize a word for dictionary lookup.
+    
+    Keys are stored lowercase, so words that are already lowercase are
+    returned as-is without allocating a new string.
+    """
+    return word if word.islower() else word.lower()
 
 
 class DictionaryManager:
@@ -15,26 +36,55 @@ class DictionaryManager:
             csv_path: Path to the CSV file containing custom words
         """
         self.csv_path = csv_path
-        self.custom_dict: Dict[str, str] = {}
+        self.custom_dict: Mapping[str, str] = MappingProxyType({})
         self.file_mtime = 0
+        # Incremented whenever the dictionary contents change
+        self.version = 0
+        self._trie: Dict[Any, Any] = {}
+        self._trie_version = -1
+        # custom_dict is a read-only view; writers replace it with an updated
+        # copy under this lock, so readers never see a dict being modified
+        self._write_lock = threading.Lock()
+        self._last_check = float('-inf')
         self.load_dictionary()
     
     def load_dictionary(self) -> None:
-        """Load custom dictionary from CSV file."""
-        if os.path.exists(self.csv_path):
-            try:
-                # Check if file has been modified
-                current_mtime = os.path.getmtime(self.csv_path)
-                if current_mtime != self.file_mtime:
-                    self.custom_dict.clear()
-                    with open(self.csv_path, 'r', encoding='utf-8') as f:
-                        reader = csv.reader(f)
-                        for row in reader:
-                            if len(row) >= 2:
-                                self.custom_dict[row[0].lower()] = row[1]
-                    self.file_mtime = current_mtime
-            except Exception as e:
-                print(f"Warning: Could not load custom dictionary: {e}")
+        """Load custom dictionary from CSV file.
+        
+        The file is checked for changes at most once per
+        RELOAD_CHECK_INTERVAL seconds.
+        """
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        with self._write_lock:
+            self._last_check = now
+            self._load_dictionary()
+    
+    def _load_dictionary(self) -> None:
+        """Load custom dictionary from CSV file if it has been modified."""
+        try:
+            # A single stat both checks existence and gets the modification time
+            current_mtime = os.stat(self.csv_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning("Could not load custom dictionary: %s", e)
+            return
+        if current_mtime == self.file_mtime:
+            return
+        try:
+            with open(self.csv_path, 'r', encoding='utf-8', newline='') as f:
+                # Keys are interned so lookups with interned words compare by identity
+                self.custom_dict = MappingProxyType({
+                    sys.intern(normalize_key(row[0])): row[1]
+                    for row in csv.reader(f)
+                    if len(row) >= 2
+                })
+            self.file_mtime = current_mtime
+            self.version += 1
+        except Exception as e:
+            logger.warning("Could not load custom dictionary: %s", e)
     
     def get(self, word: str) -> str:
         """Get the katakana reading for a word.
@@ -45,7 +95,30 @@ class DictionaryManager:
         Returns:
             The katakana reading if found, otherwise None
         """
-        return self.custom_dict.get(word.lower())
+        return self.custom_dict.get(normalize_key(word))
+    
+    def get_trie(self) -> Dict[Any, Any]:
+        """Get a character trie over the dictionary keys.
+        
+        Each node maps a character to its child node. A node that completes
+        a key stores the katakana reading under the ``None`` key. The trie
+        is rebuilt only after the dictionary has changed.
+        
+        Returns:
+            The root node of the trie
+        """
+        # Read the version before the dict; writers swap the dict first
+        version = self.version
+        if self._trie_version != version:
+            trie: Dict[Any, Any] = {}
+            for english, katakana in self.custom_dict.items():
+                node = trie
+                for char in english:
+                    node = node.setdefault(char, {})
+                node[None] = katakana
+            self._trie = trie
+            self._trie_version = version
+        return self._trie
     
     def add_entry(self, english: str, katakana: str) -> Tuple[bool, str]:
         """Add or update a dictionary entry.
@@ -57,54 +130,56 @@ class DictionaryManager:
         Returns:
             Tuple of (success, message)
         """
+        return self.add_entries([(english, katakana)])[0]
+    
+    def add_entries(self, entries: List[Tuple[str, str]]) -> List[Tuple[bool, str]]:
+        """Add or update several dictionary entries with a single file write.
+        
+        Args:
+            entries: List of (english, katakana) pairs
+            
+        Returns:
+            List of (success, message) tuples, one per entry
+        """
+        with self._write_lock:
+            return self._add_entries(entries)
+    
+    def _add_entries(self, entries: List[Tuple[str, str]]) -> List[Tuple[bool, str]]:
+        """Add or update entries; the caller must hold the write lock."""
         try:
-            # Validate inputs
-            if not english or not katakana:
-                return False, "エラー: 英単語とカタカナの両方を指定してください"
-            
-            # Convert to lowercase for consistency
-            english_lower = english.lower()
-            
-            # Update in-memory dictionary
-            self.custom_dict[english_lower] = katakana
-            
-            # Read existing entries
-            existing_entries = []
-            if os.path.exists(self.csv_path):
-                with open(self.csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    existing_entries = list(reader)
-            
-            # Check if entry already exists and update it
-            entry_updated = False
-            for i, row in enumerate(existing_entries):
-                if len(row) >= 2 and row[0].lower() == english_lower:
-                    existing_entries[i] = [english_lower, katakana]
-                    entry_updated = True
-                    break
-            
-            # Add new entry if not updating
-            if not entry_updated:
-                existing_entries.append([english_lower, katakana])
-            
-            # Sort entries for better readability
-            existing_entries.sort(key=lambda x: x[0] if x else '')
-            
-            # Write back to file
-            with open(self.csv_path, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerows(existing_entries)
+            # Pick up external edits before the file is rewritten from memory
+            self._load_dictionary()
+            custom_dict = dict(self.custom_dict)
+            
+            results = []
+            for english, katakana in entries:
+                # Validate inputs
+                if not english or not katakana:
+                    results.append((False, "エラー: 英単語とカタカナの両方を指定してください"))
+                    continue
+                
+                # Convert to lowercase for consistency
+                english_lower = sys.intern(english.lower())
+                entry_updated = english_lower in custom_dict
+                
+                # Update in-memory dictionary
+                custom_dict[english_lower] = katakana
+                
+                if entry_updated:
+                    results.append((True, f"✓ 辞書を更新しました: {english_lower} → {katakana}"))
+                else:
+                    results.append((True, f"✓ 辞書に登録しました: {english_lower} → {katakana}"))
             
-            # Update modification time
-            self.file_mtime = os.path.getmtime(self.csv_path)
+            if any(success for success, _ in results):
+                self.custom_dict = MappingProxyType(custom_dict)
+                self.version += 1
+                self._write_entries()
             
-            if entry_updated:
-                return True, f"✓ 辞書を更新しました: {english_lower} → {katakana}"
-            else:
-                return True, f"✓ 辞書に登録しました: {english_lower} → {katakana}"
+            return results
                 
         except Exception as e:
-            return False, f"エラー: 辞書への登録に失敗しました - {str(e)}"
+            message = f"エラー: 辞書への登録に失敗しました - {str(e)}"
+            return [(False, message) for _ in entries]
     
     def remove_entry(self, english: str) -> Tuple[bool, str]:
         """Remove a dictionary entry.
@@ -115,36 +190,102 @@ class DictionaryManager:
         Returns:
             Tuple of (success, message)
         """
+        return self.remove_entries([english])[0]
+    
+    def remove_entries(self, englishes: List[str]) -> List[Tuple[bool, str]]:
+        """Remove several dictionary entries with a single file write.
+        
+        Args:
+            englishes: The English words to remove
+            
+        Returns:
+            List of (success, message) tuples, one per word
+        """
+        with self._write_lock:
+            return self._remove_entries(englishes)
+    
+    def _remove_entries(self, englishes: List[str]) -> List[Tuple[bool, str]]:
+        """Remove entries; the caller must hold the write lock."""
         try:
-            english_lower = english.lower()
-            
-            # Remove from in-memory dictionary
-            if english_lower in self.custom_dict:
-                del self.custom_dict[english_lower]
-            else:
-                return False, f"エラー: '{english}' は辞書に登録されていません"
-            
-            # Read and update file
-            existing_entries = []
-            if os.path.exists(self.csv_path):
-                with open(self.csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    for row in reader:
-                        if len(row) >= 2 and row[0].lower() != english_lower:
-                            existing_entries.append(row)
-            
-            # Write back to file
-            with open(self.csv_path, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerows(existing_entries)
+            # Pick up external edits before the file is rewritten from memory
+            self._load_dictionary()
+            custom_dict = dict(self.custom_dict)
             
-            # Update modification time
-            self.file_mtime = os.path.getmtime(self.csv_path)
+            results = []
+            removed = False
+            for english in englishes:
+                english_lower = english.lower()
+                
+                # Remove from in-memory dictionary
+                if english_lower in custom_dict:
+                    del custom_dict[english_lower]
+                    removed = True
+                    results.append((True, f"✓ 辞書から削除しました: {english_lower}"))
+                else:
+                    results.append((False, f"エラー: '{english}' は辞書に登録されていません"))
             
-            return True, f"✓ 辞書から削除しました: {english_lower}"
+            if not removed:
+                return results
+            self.custom_dict = MappingProxyType(custom_dict)
+            self.version += 1
+            self._write_entries()
+            return results
             
         except Exception as e:
-            return False, f"エラー: 辞書からの削除に失敗しました - {str(e)}"
+            message = f"エラー: 辞書からの削除に失敗しました - {str(e)}"
+            return [(False, message) for _ in englishes]
+    
+    async def add_entries_async(self, entries: List[Tuple[str, str]]) -> List[Tuple[bool, str]]:
+        """Async variant of add_entries that runs the file I/O in a worker thread.
+        
+        Args:
+            entries: List of (english, katakana) pairs
+            
+        Returns:
+            List of (success, message) tuples, one per entry
+        """
+        return await asyncio.to_thread(self.add_entries, entries)
+    
+    async def remove_entries_async(self, englishes: List[str]) -> List[Tuple[bool, str]]:
+        """Async variant of remove_entries that runs the file I/O in a worker thread.
+        
+        Args:
+            englishes: The English words to remove
+            
+        Returns:
+            List of (success, message) tuples, one per word
+        """
+        return await asyncio.to_thread(self.remove_entries, englishes)
+    
+    def _write_entries(self) -> None:
+        """Atomically replace the CSV file with the in-memory dictionary."""
+        # A unique temp file per write, since several server processes (one
+        # per model) may share the same CSV file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.csv_path)), suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                # Sort entries for better readability
+                writer.writerows(sorted(self.custom_dict.items()))
+            # mkstemp creates the file owner-only; keep the CSV's permissions
+            try:
+                mode = os.stat(self.csv_path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.csv_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        # Update modification time; our own write needs no reload check
+        self.file_mtime = os.stat(self.csv_path).st_mtime_ns
+        self._last_check = time.monotonic()
     
     def list_entries(self) -> str:
         """List all dictionary entries.
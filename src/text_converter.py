@@ -1,14 +1,61 @@
 """Text conversion module for converting text to katakana."""
 
 import re
-from typing import Tuple, List, Optional
-from .dictionary_manager import DictionaryManager
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple, List, Optional
+from .dictionary_manager import DictionaryManager, normalize_key
 
 try:
     import alkana
 except ImportError:
     alkana = None
 
+# Maximum number of whole-text conversion results kept in memory
+RESULT_CACHE_SIZE = 1024
+
+# Maximum number of per-word conversion results kept in memory
+WORD_CACHE_SIZE = 8192
+
+# Enhanced tokenization pattern that captures:
+# - Japanese text (hiragana, katakana, kanji)
+# - English words and file names with extensions (e.g., "main.py")
+# - Extensions alone (e.g., ".py")
+# - Numbers with optional Japanese suffix (e.g., "2つ", "3個")
+# - Other characters
+# Words and file names share one possessive alternative so a letter run is
+# scanned once instead of being retried by a separate word alternative.
+# The alternatives start with disjoint characters (apart from "." for
+# extensions, which must precede punctuation), so Japanese is tried first
+# as the most common token in Japanese-heavy text.
+_TOKEN_RE = re.compile(
+    r'(?P<japanese>[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]++)|'  # Japanese
+    r'(?P<word>[A-Za-z]++(?:\.[A-Za-z]++)?)|'  # English words and files
+    r'(?P<ext>\.[A-Za-z]++)|'           # Extensions only
+    r'(?P<number>\d+[つ個枚本件度回目番月日年時分秒]?)|'  # Numbers with optional counters
+    r'(?P<punct>[^\w\s])|'             # Punctuation
+    r'(?P<space>\s+)'                  # Whitespace
+)
+
+# The same tokens for pure-ASCII text, where the Japanese alternative and
+# the counter suffixes can never match
+_ASCII_TOKEN_RE = re.compile(
+    r'(?P<word>[A-Za-z]++(?:\.[A-Za-z]++)?)|'
+    r'(?P<ext>\.[A-Za-z]++)|'
+    r'(?P<number>\d+)|'
+    r'(?P<punct>[^\w\s])|'
+    r'(?P<space>\s+)'
+)
+
+# Characters that alkana or the unconverted-word tracking may act on
+_CONVERTIBLE_RE = re.compile(r'[A-Za-z0-9.]')
+
+
+@lru_cache(maxsize=4096)
+def _kana_lookup(word: str) -> Optional[str]:
+    """Look up the alkana reading of a lowercase English word (cached)."""
+    return alkana.get_kana(word) if alkana else None
+
 
 class TextConverter:
     """Converts text including English, numbers, and Japanese to appropriate katakana."""
@@ -20,6 +67,10 @@ class TextConverter:
             dictionary_manager: Instance of DictionaryManager for custom words
         """
         self.dict_manager = dictionary_manager
+        self._result_cache: "OrderedDict[Tuple[str, int], Tuple[str, Tuple[str, ...]]]" = OrderedDict()
+        # Per-word results, valid for the dictionary version they were built with
+        self._word_cache: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._word_cache_version = -1
     
     def convert_to_katakana(self, text: str) -> Tuple[str, List[str]]:
         """Convert text to katakana using custom dictionary and alkana.
@@ -38,114 +89,188 @@ class TextConverter:
         """
         # Reload dictionary to get latest changes
         self.dict_manager.load_dictionary()
+        return self._convert_cached(text)
+    
+    def convert_many(self, texts: Iterable[str]) -> List[Tuple[str, List[str]]]:
+        """Convert several texts, checking the dictionary for changes only once.
+        
+        Args:
+            texts: Texts to convert
+            
+        Returns:
+            List of (converted_text, unconverted_words) tuples, one per text
+        """
+        self.dict_manager.load_dictionary()
+        convert_cached = self._convert_cached
+        return [convert_cached(text) for text in texts]
+    
+    def _convert_cached(self, text: str) -> Tuple[str, List[str]]:
+        """Convert text to katakana, reusing cached results where possible.
+        
+        Args:
+            text: Text to convert
+            
+        Returns:
+            Tuple of (converted_text, unconverted_words)
+        """
+        # Nothing to convert when the text has no ASCII letters, digits or
+        # dots and no dictionary entry starts with one of its characters
+        if not _CONVERTIBLE_RE.search(text):
+            trie = self.dict_manager.get_trie()
+            if not any(char in text for char in trie if char is not None):
+                return text, []
+        
+        # Reuse the previous result while the dictionary is unchanged
+        key = (text, self.dict_manager.version)
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            self._result_cache.move_to_end(key)
+            return cached[0], list(cached[1])
+        
+        converted_text, unconverted_words = self._convert(text)
+        self._result_cache[key] = (converted_text, tuple(unconverted_words))
+        if len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+        return converted_text, unconverted_words
+    
+    def _convert(self, text: str) -> Tuple[str, List[str]]:
+        """Convert text to katakana without consulting the result cache.
         
+        Args:
+            text: Text to convert
+            
+        Returns:
+            Tuple of (converted_text, unconverted_words)
+        """
         if not alkana and not self.dict_manager.custom_dict:
             return text, []
         
-        # Enhanced tokenization pattern that captures:
-        # - File names with extensions (e.g., "main.py")
-        # - Extensions alone (e.g., ".py")
-        # - English words
-        # - Numbers with optional Japanese suffix (e.g., "2つ", "3個")
-        # - Japanese text (hiragana, katakana, kanji)
-        # - Other characters
-        tokens = re.findall(
-            r'[A-Za-z]+\.[A-Za-z]+|'  # Files with extensions
-            r'\.[A-Za-z]+|'            # Extensions only
-            r'[A-Za-z]+|'              # English words
-            r'\d+[つ個枚本件度回目番月日年時分秒]?|'  # Numbers with optional counters
-            r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]+|'  # Japanese
-            r'[^\w\s]|'                # Punctuation
-            r'\s+',                    # Whitespace
-            text
-        )
-        
-        converted_tokens = []
-        unconverted_words = []
-        
-        # Process tokens
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-            converted = False
+        trie = self.dict_manager.get_trie()
+        unconverted_words: List[str] = []
+        # End of the last dictionary entry; tokens before it are already replaced
+        consumed = 0
+        
+        # Bind hot-loop methods to locals to skip attribute lookups per token
+        convert_word = self._convert_single_word
+        match_dictionary = self._match_dictionary
+        get_katakana = self.dict_manager.get
+        
+        def replace(match: "re.Match[str]") -> str:
+            nonlocal consumed
+            if match.start() < consumed:
+                return ''
+            token = match.group()
             
             # First, check if this token (or combination) is in the dictionary
-            # Try longer combinations first (for cases like "2つ目")
-            for length in range(min(3, len(tokens) - i), 0, -1):
-                combined_token = ''.join(tokens[i:i+length])
-                if self.dict_manager.get(combined_token):
-                    converted_tokens.append(self.dict_manager.get(combined_token))
-                    i += length
-                    converted = True
-                    break
+            # The longest entry wins (for cases like "2つ目")
+            katakana, end = match_dictionary(trie, text, match)
+            if katakana:
+                consumed = end
+                return katakana
             
-            if converted:
-                continue
+            kind = match.lastgroup
             
+            # Whitespace, Japanese text and punctuation (other than ".") were
+            # only convertible through the dictionary, which was checked above
+            if kind == 'space' or kind == 'japanese' or (kind == 'punct' and token != '.'):
+                return token
+            # Numbers have no alkana reading either; only those starting with
+            # an ASCII digit are reported, not full-width or other digits
+            if kind == 'number':
+                if token[0].isascii():
+                    unconverted_words.append(token)
+                return token
             # Handle file names with extensions
-            if re.match(r'^[A-Za-z]+\.[A-Za-z]+$', token):
-                parts = token.split('.')
-                base_word = parts[0]
-                extension = '.' + parts[1]
+            if kind == 'word' and '.' in token:
+                dot = token.rfind('.')
+                base_word = token[:dot]
+                extension = token[dot:]
                 
-                # Check if full filename is in dictionary
-                if self.dict_manager.get(token):
-                    converted_tokens.append(self.dict_manager.get(token))
-                # Check if extension is in dictionary
-                elif self.dict_manager.get(extension):
-                    # Convert base word
-                    base_converted = self._convert_single_word(base_word)
-                    converted_tokens.append(base_converted[0])
-                    if base_converted[1]:
-                        unconverted_words.extend(base_converted[1])
-                    # Add extension from dictionary
-                    converted_tokens.append(self.dict_manager.get(extension))
-                else:
-                    # Convert as single token
-                    result = self._convert_single_word(token)
-                    converted_tokens.append(result[0])
-                    if result[1]:
-                        unconverted_words.extend(result[1])
-            else:
-                # Convert single token
-                result = self._convert_single_word(token)
-                converted_tokens.append(result[0])
-                if result[1]:
-                    unconverted_words.extend(result[1])
+                # The full filename was already checked against the
+                # dictionary above, so only the extension is left to check
+                extension_katakana = get_katakana(extension)
+                if extension_katakana:
+                    # Convert base word and add extension from dictionary
+                    return convert_word(base_word, unconverted_words) + extension_katakana
             
-            i += 1
+            # Convert single token
+            return convert_word(token, unconverted_words)
         
-        return ''.join(converted_tokens), unconverted_words
+        # Tokenize and convert in one pass; characters no token pattern
+        # matches are kept as they are
+        token_re = _ASCII_TOKEN_RE if text.isascii() else _TOKEN_RE
+        return token_re.sub(replace, text), unconverted_words
     
-    def _convert_single_word(self, word: str) -> Tuple[str, List[str]]:
-        """Convert a single word to katakana.
+    @staticmethod
+    def _match_dictionary(trie: Dict[Any, Any], text: str, match: "re.Match[str]") -> Tuple[Optional[str], int]:
+        """Find the longest dictionary entry made of whole tokens from match.
+        
+        Args:
+            trie: Trie over the dictionary keys
+            text: Text being converted
+            match: Token the entry starts with
+            
+        Returns:
+            Tuple of (katakana or None, end position of the entry in text)
+        """
+        node = trie
+        katakana, end = None, match.start()
+        while match:
+            for char in normalize_key(match.group()):
+                node = node.get(char)
+                if node is None:
+                    return katakana, end
+            # Entries only match on token boundaries
+            if node.get(None):
+                katakana, end = node[None], match.end()
+            # The next token has to follow directly to extend the entry
+            match = _TOKEN_RE.match(text, match.end())
+        return katakana, end
+    
+    def _convert_single_word(self, word: str, unconverted_words: List[str]) -> str:
+        """Convert a single word to katakana, reusing earlier results.
         
         Args:
             word: Word to convert
+            unconverted_words: List the word is added to if it can't be converted
             
         Returns:
-            Tuple of (converted_word, [unconverted_word] or [])
+            Converted word
         """
-        # Check if it's a convertible pattern (English, numbers, etc.)
-        if not re.match(r'^[\w\.]+$', word):
-            # Not a word that needs conversion (punctuation, etc.)
-            return word, []
+        version = self.dict_manager.version
+        if self._word_cache_version != version or len(self._word_cache) >= WORD_CACHE_SIZE:
+            self._word_cache = {}
+            self._word_cache_version = version
+        
+        result = self._word_cache.get(word)
+        if result is None:
+            result = self._word_cache[word] = self._convert_word(word)
+        converted, unconverted = result
+        if unconverted is not None:
+            unconverted_words.append(unconverted)
+        return converted
+    
+    def _convert_word(self, word: str) -> Tuple[str, Optional[str]]:
+        """Convert a single word to katakana.
         
-        word_lower = word.lower()
+        Args:
+            word: English word, file name, extension or "."
+            
+        Returns:
+            Tuple of (converted_word, unconverted_word or None)
+        """
+        word_lower = normalize_key(word)
         
-        # First try custom dictionary
-        if self.dict_manager.get(word_lower):
-            return self.dict_manager.get(word_lower), []
+        # First try custom dictionary; the key is already normalized
+        katakana = self.dict_manager.custom_dict.get(word_lower)
+        if katakana:
+            return katakana, None
         
-        # For English words, try alkana
-        if re.match(r'^[A-Za-z\.]+$', word) and alkana:
-            katakana = alkana.get_kana(word_lower)
+        # Then try alkana
+        if alkana:
+            katakana = _kana_lookup(word_lower)
             if katakana:
-                return katakana, []
-        
-        # If not converted, track it (but not Japanese text)
-        if re.match(r'^[A-Za-z0-9\.]+', word):
-            return word, [word_lower]
+                return katakana, None
         
-        # Return as-is for Japanese text
-        return word, []
\ No newline at end of file
+        # If not converted, track it
+        return word, word_lower
\ No newline at end of file